@@ -32,7 +32,30 @@ def get_sorted_images(image_dir: Path) -> list[Path]:
     return sorted(images, key=get_number)
 
 
-def create_animation(image_paths: list[Path], output_path: Path, duration: int = 100, loop: int = 0):
+def get_padding_frames(run_dir: Path, num_images: int) -> int:
+    """
+    Get the number of frames a run skipped by stopping early once absorbed.
+
+    Args:
+        run_dir: Path to run directory (e.g., out/experiment/run_0)
+        num_images: Number of graph images saved for the run
+
+    Returns:
+        Number of frames between the last saved image and the run's step horizon
+    """
+    description_path = run_dir / "graph_description.txt"
+    if not description_path.exists():
+        return 0
+
+    with open(description_path, 'r') as f:
+        for line in f:
+            if line.startswith("Step Horizon:"):
+                # one image per step from 0 to the horizon
+                return max(int(line.split(":")[1].strip()) + 1 - num_images, 0)
+    return 0
+
+
+def create_animation(image_paths: list[Path], output_path: Path, duration: int = 100, loop: int = 0, padding_frames: int = 0):
     """
     Create an animated GIF from a sequence of images.
 
@@ -41,6 +64,7 @@ def create_animation(image_paths: list[Path], output_path: Path, duration: int =
         output_path: Path where the animated GIF should be saved
         duration: Duration of each frame in milliseconds (default: 100ms)
         loop: Number of times to loop (0 = infinite, default: 0)
+        padding_frames: Number of extra frames to hold the last image for (default: 0)
     """
     if not image_paths:
         print(f"No images found for {output_path}")
@@ -49,12 +73,16 @@ def create_animation(image_paths: list[Path], output_path: Path, duration: int =
     # Load all images
     frames = [Image.open(img) for img in image_paths]
 
+    # Hold the last image instead of storing identical frames
+    durations = [duration] * len(frames)
+    durations[-1] += padding_frames * duration
+
     # Save as animated GIF
     frames[0].save(
         output_path,
         save_all=True,
         append_images=frames[1:],
-        duration=duration,
+        duration=durations,
         loop=loop,
         optimize=False
     )
@@ -89,7 +117,8 @@ def animate_run(run_dir: Path, output_dir: Path, duration: int = 100):
     output_filename = f"{experiment_name}_{run_name}.gif"
     output_path = output_dir / output_filename
 
-    create_animation(image_paths, output_path, duration)
+    padding_frames = get_padding_frames(run_dir, len(image_paths))
+    create_animation(image_paths, output_path, duration, padding_frames=padding_frames)
 
 
 def animate_experiment(experiment_dir: Path, output_dir: Path, duration: int = 100):
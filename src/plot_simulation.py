@@ -6,12 +6,42 @@ from seir_config import SEIRConfig
 from seir_population_state import SEIRPopulationState
 
 
+def get_run_extent(config: SEIRConfig, run_idx: int):
+    """
+    Return (final_step, absorbed) for a run.
+
+    final_step is the last simulated step, or None for runs written before
+    early termination existed. absorbed is True if no exposed or infectious
+    agents remained, so the final state holds for every later step.
+    """
+    desc_path = f"out/{config.exp_name}/run_{run_idx}/graph_description.txt"
+    final_step = None
+    absorbed = False
+    with open(desc_path, 'r') as f:
+        for line in f:
+            if line.startswith("Final Step:"):
+                final_step = int(line.split(":")[1].strip())
+            elif line.startswith("Time to Steady State:"):
+                absorbed = line.split(":")[1].strip() != "Not reached"
+    return final_step, absorbed
+
+
 def plot_simulation(config: SEIRConfig):
+    extents = [get_run_extent(config, run_idx) for run_idx in range(config.num_runs)]
+    num_steps = config.num_steps
+    if config.until_absorbed:
+        # runs have different lengths, so plot up to the longest one
+        num_steps = max((step for step, _ in extents if step is not None), default=config.num_steps - 1) + 1
+    # don't extend the x axis past the last step any run has data for
+    last_steps = [num_steps - 1 if step is None or absorbed else step for step, absorbed in extents]
+    num_steps = min(num_steps, max(last_steps, default=num_steps - 1) + 1)
+
     # Initialize arrays to hold counts for all runs: (num_runs, num_steps)
-    s_all = np.zeros((config.num_runs, config.num_steps))
-    e_all = np.zeros((config.num_runs, config.num_steps))
-    i_all = np.zeros((config.num_runs, config.num_steps))
-    r_all = np.zeros((config.num_runs, config.num_steps))
+    # steps a run never reached stay NaN and are left out of the mean and quartiles
+    s_all = np.full((config.num_runs, num_steps), np.nan)
+    e_all = np.full((config.num_runs, num_steps), np.nan)
+    i_all = np.full((config.num_runs, num_steps), np.nan)
+    r_all = np.full((config.num_runs, num_steps), np.nan)
 
     # Arrays to store statistics from each run
     peak_infections_runs = []
@@ -49,17 +79,24 @@ def plot_simulation(config: SEIRConfig):
                 elif line.startswith("Average Degree: "):
                     avg_degree_runs.append(float(line.split(":")[1].strip()))
                 elif line.startswith("Radius: "):
-                    radius_runs.append(float(line.split(":")[1].strip()))
+                    value = line.split(":")[1].strip()
+                    radius_runs.append(None if value == "Not computed" else float(value))
                 elif line.startswith("Diameter: "):
-                    diameter_runs.append(float(line.split(":")[1].strip()))
-
-        for step in range(config.num_steps):
-            path = f"out/{config.exp_name}/run_{run_idx}/graph_state/{step}.json"
+                    value = line.split(":")[1].strip()
+                    diameter_runs.append(None if value == "Not computed" else float(value))
+
+        final_step, absorbed = extents[run_idx]
+        for step in range(num_steps):
+            if final_step is not None and step > final_step:
+                if absorbed:
+                    # the run stopped once absorbed, so the rest of the curve repeats its final state
+                    for data in (s_all, e_all, i_all, r_all):
+                        data[run_idx, step:] = data[run_idx, final_step]
+                # otherwise the run was cut short (cancelled or capped) and its series ends here
+                break
+            path = f"out/{config.exp_name}/run_{run_idx}/graph_state/{step}{config.graph_state_ext}"
             state = SEIRPopulationState.load(path)
-            s_all[run_idx, step] = len(state.susceptible_nodes)
-            e_all[run_idx, step] = len(state.exposed_nodes)
-            i_all[run_idx, step] = len(state.infectious_nodes)
-            r_all[run_idx, step] = len(state.recovered_nodes)
+            s_all[run_idx, step], e_all[run_idx, step], i_all[run_idx, step], r_all[run_idx, step] = state.get_counts()
 
     datasets = [
         (s_all, 'S', 'blue'),
@@ -68,14 +105,14 @@ def plot_simulation(config: SEIRConfig):
         (r_all, 'R', 'green')
     ]
 
-    steps = np.arange(config.num_steps)
+    steps = np.arange(num_steps)
 
     fig, ax = plt.subplots(figsize=(12, 6))
 
     for data, label, color in datasets:
-        mean = np.mean(data, axis=0)
-        q25 = np.quantile(data, 0.25, axis=0)
-        q75 = np.quantile(data, 0.75, axis=0)
+        mean = np.nanmean(data, axis=0)
+        q25 = np.nanquantile(data, 0.25, axis=0)
+        q75 = np.nanquantile(data, 0.75, axis=0)
 
         ax.plot(steps, mean, label=label, color=color)
         ax.fill_between(steps, q25, q75, color=color, alpha=0.2)
@@ -161,8 +198,14 @@ def plot_simulation(config: SEIRConfig):
         f.write(f"Average Maximum Degree: {avg_max_degree:.5f}\n")
         f.write(f"Average Density: {avg_density:.5f}\n")
         f.write(f"Average Average Degree: {avg_avg_degree:.5f}\n")
-        f.write(f"Average Radius: {avg_radius:.5f}\n")
-        f.write(f"Average Diameter: {avg_diameter:.5f}\n")
+        if avg_radius is not None:
+            f.write(f"Average Radius: {avg_radius:.5f}\n")
+        else:
+            f.write(f"Average Radius: Not computed\n")
+        if avg_diameter is not None:
+            f.write(f"Average Diameter: {avg_diameter:.5f}\n")
+        else:
+            f.write(f"Average Diameter: Not computed\n")
 
     print(f"Experiment statistics written to {summary_path}")
 
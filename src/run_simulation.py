@@ -1,19 +1,39 @@
 import os
 import sys
 import argparse
-from seir_graph import SEIRGraph
+from seir_graph import build_seir_graph
 from seir_config import SEIRConfig
+from seir_metrics_server import SEIRMetricsServer
+from seir_output_writer import SEIROutputWriter
 
 
 def run_simulation(config: SEIRConfig):
     print("Running simulations for " + config.exp_name)
-    for i in range(config.num_runs):
-        config.out_dir = "out/" + config.exp_name + "/run_" + str(i) + "/"
-        os.makedirs(config.out_dir, exist_ok=True)
-        os.makedirs(config.out_dir + "graph_state/", exist_ok=True)
-        os.makedirs(config.out_dir + "graph_images/", exist_ok=True)
-        graph = SEIRGraph(config)
-        graph.run()
+    metrics_server = None
+    if config.serve_metrics:
+        metrics_server = SEIRMetricsServer(config.metrics_host, config.metrics_port)
+        metrics_server.start()
+    try:
+        # one writer for the whole experiment so a run's output can flush while the next run steps
+        with SEIROutputWriter(
+            queue_size=config.output_queue_size,
+            asynchronous=config.async_output,
+            render_processes=config.render_processes if config.render_images else 0,
+        ) as writer:
+            for i in range(config.num_runs):
+                config.out_dir = "out/" + config.exp_name + "/run_" + str(i) + "/"
+                os.makedirs(config.out_dir, exist_ok=True)
+                os.makedirs(config.out_dir + "graph_state/", exist_ok=True)
+                os.makedirs(config.out_dir + "graph_images/", exist_ok=True)
+                graph = build_seir_graph(config, writer)
+                if metrics_server is not None:
+                    graph.add_observer(metrics_server.publish)
+                    # POST /cancel stops whichever run is currently stepping
+                    metrics_server.on_cancel = graph.cancel
+                graph.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
 
 if __name__ == "__main__":
     argparser = argparse.ArgumentParser()
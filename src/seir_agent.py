@@ -1,8 +1,9 @@
 from enum import Enum
-import math
 
 import numpy as np
 
+from seir_durations import DEFAULT_EXPOSED_DURATION, DEFAULT_INFECTIOUS_SIGMA, LognormalDuration
+
 class SEIRState(Enum):
     SUSCEPTIBLE = 0
     EXPOSED = 1
@@ -16,21 +17,28 @@ color_map = {
     SEIRState.RECOVERED: "green"
 }
 
+def infectious_prob(p1_c, beta, days_spent_infectious):
+    d = days_spent_infectious
+
+    numerator = (p1_c / (1 - p1_c)) * np.exp(beta * (d**3 - 1))
+    denominator = 1 + numerator
+    prob_infect = numerator / denominator
+
+    return prob_infect
+
 class SEIRAgent:
-    def __init__(self, agent_id, p1_c = 0.12, beta = -0.00504, infectious_duration = 2.25):
+    def __init__(self, agent_id, p1_c = 0.12, beta = -0.00504, infectious_duration = 2.25, countdown_to_infectious = None, countdown_to_recovered = None):
         self.agent_id = agent_id
         self.beta = beta
         self.p_1c = p1_c
 
-        # sample from a lognormal distribution for exposed state duration
-        mu_e = 1.0
-        sigma_e = 1.0
-        self.countdown_to_infectious = math.ceil(np.random.lognormal(mu_e, sigma_e))
-
-        # sample from a lognormal distribution for infectious state duration
-        mu_i = infectious_duration
-        sigma_i = 0.105
-        self.countdown_to_recovered = math.ceil(np.random.lognormal(mu_i, sigma_i))
+        # countdowns are normally sampled for the whole population at once by SEIRGraph
+        if countdown_to_infectious is None:
+            countdown_to_infectious = int(DEFAULT_EXPOSED_DURATION.sample())
+        if countdown_to_recovered is None:
+            countdown_to_recovered = int(LognormalDuration(infectious_duration, DEFAULT_INFECTIOUS_SIGMA).sample())
+        self.countdown_to_infectious = countdown_to_infectious
+        self.countdown_to_recovered = countdown_to_recovered
 
         self.days_spent_infectious = 0
         self.state = SEIRState.SUSCEPTIBLE
@@ -40,13 +48,7 @@ class SEIRAgent:
         self.neighbors = neighbors
 
     def get_infectious_prob(self):
-        d = self.days_spent_infectious
-
-        numerator = (self.p_1c / (1 - self.p_1c)) * np.exp(self.beta * (d**3 - 1))
-        denominator = 1 + numerator
-        prob_infect = numerator / denominator
-
-        return prob_infect
+        return infectious_prob(self.p_1c, self.beta, self.days_spent_infectious)
 
     def step(self):
         if self.state == SEIRState.SUSCEPTIBLE:
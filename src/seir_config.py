@@ -4,13 +4,20 @@ import random
 
 import yaml
 
+from seir_durations import DEFAULT_EXPOSED_DURATION, DEFAULT_INFECTIOUS_SIGMA, LognormalDuration, duration_from_config
+
 class GraphType(Enum):
     CIRCULANT = "circulant"
     COMPLETE = "complete"
     LATTICE = "lattice"
     SCALE_FREE = "scale_free"
     INFECT_DUBLIN = "infect_dublin"
-    
+
+class EngineType(Enum):
+    AUTO = "auto"
+    AGENT = "agent"
+    MEAN_FIELD = "mean_field"
+
 class SEIRConfig:
     def __init__(self, file_path: str):
         # read config in from yaml
@@ -30,16 +37,49 @@ class SEIRConfig:
         self.p1_c = config['simulation'].get('p1_c', 0.12)
         self.beta = config['simulation'].get('beta', -0.00504)
         self.infectious_duration = config['simulation'].get('infectious_duration', 2.25)
+        # a number is the lognormal mu of the infectious period, as before; a mapping picks the distribution
+        if isinstance(self.infectious_duration, dict):
+            self.infectious_distribution = duration_from_config(self.infectious_duration, None)
+        else:
+            self.infectious_distribution = LognormalDuration(self.infectious_duration, DEFAULT_INFECTIOUS_SIGMA)
+        self.exposed_distribution = duration_from_config(config['simulation'].get('exposed_duration'), DEFAULT_EXPOSED_DURATION)
 
 
         self.num_agents = config['simulation']['num_agents']
         self.num_steps = config['simulation'].get('num_steps', 100)
+        self.stop_when_absorbed = config['simulation'].get('stop_when_absorbed', True)
+        # ignore num_steps and run until absorption, capped at max_steps
+        self.until_absorbed = config['simulation'].get('until_absorbed', False)
+        self.max_steps = config['simulation'].get('max_steps', 10000)
         self.graph_type = GraphType(config['graph']['type'])
+        self.engine = EngineType(config['simulation'].get('engine', 'auto'))
+        self.mean_field_threshold = config['simulation'].get('mean_field_threshold', 1000)
         self._extract_graph_config(self.graph_type)
         self.susceptible_percent = config['initial_population']['susceptible']
         self.exposed_percent = config['initial_population']['exposed']
         self.infectious_percent = config['initial_population']['infectious']
 
+        output = config.get('output', {})
+        self.async_output = output.get('async', True)
+        self.output_queue_size = output.get('queue_size', 64)
+        self.render_images = output.get('render_images', True)
+        # diameter and radius need all-pairs shortest paths, which is slow on large graphs
+        self.distance_metrics = output.get('distance_metrics', True)
+        # rendering in processes only pays off with a spare core per process
+        self.render_processes = output.get('render_processes', min((os.cpu_count() or 1) - 1, 4))
+        self.compress_output = output.get('compress', False)
+        self.graph_state_ext = ".json.gz" if self.compress_output else ".json"
+
+        metrics = config.get('metrics', {})
+        self.serve_metrics = metrics.get('serve', False)
+        self.metrics_host = metrics.get('host', "127.0.0.1")
+        self.metrics_port = metrics.get('port', 8765)
+
+        cache = config.get('cache', {})
+        self.cache_enabled = cache.get('enabled', True)
+        self.cache_dir = cache.get('dir', "cache/graphs")
+        self.cache_max_bytes = int(cache.get('max_size_mb', 1024) * 1024 * 1024)
+
     def _extract_graph_config(self, graph_type):
         if graph_type == GraphType.CIRCULANT:
             self.num_neighbors = self.config['graph']['neighbors']
@@ -0,0 +1,187 @@
+import numpy as np
+
+
+class CSRGraph:
+    """
+    Undirected graph stored as a CSR adjacency.
+
+    Nodes are the integers 0..n-1 and the neighbors of node i are
+    indices[indptr[i]:indptr[i + 1]], sorted ascending. Every edge appears once
+    in each direction.
+
+    Args:
+        indptr: int64 array of length n + 1 with the offset of each node's neighbors
+        indices: int32 array with the concatenated neighbor lists
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, num_nodes: int, src: np.ndarray, dst: np.ndarray):
+        """
+        Build a CSR graph from an undirected edge list.
+
+        Each (src[k], dst[k]) pair is added in both directions; duplicate
+        edges and self-loops are dropped.
+        """
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+
+        # sort by (row, col) through a single key, then drop repeated edges
+        keys = np.sort(rows * num_nodes + cols)
+        keys = keys[np.concatenate([keys[:1] >= 0, keys[1:] != keys[:-1]])]
+        rows = keys // num_nodes
+        cols = keys % num_nodes
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32))
+
+    def number_of_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def number_of_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def to_networkx(self):
+        """
+        Export to a networkx Graph with the same integer node IDs.
+
+        networkx is imported here so that building and simulating a graph
+        does not depend on it.
+        """
+        import networkx as nx
+
+        rows = np.repeat(np.arange(self.number_of_nodes()), self.degrees())
+        upper = rows < self.indices
+        G = nx.Graph()
+        G.add_nodes_from(range(self.number_of_nodes()))
+        G.add_edges_from(zip(rows[upper].tolist(), self.indices[upper].tolist()))
+        return G
+
+
+def circulant_graph(num_nodes: int, offsets: list[int]) -> CSRGraph:
+    """
+    Circulant graph where node i is connected to i +/- o (mod n) for each offset o.
+    """
+    nodes = np.arange(num_nodes, dtype=np.int64)
+    src = np.tile(nodes, len(offsets))
+    dst = (src + np.repeat(np.asarray(offsets, dtype=np.int64), num_nodes)) % num_nodes
+    return CSRGraph.from_edges(num_nodes, src, dst)
+
+
+def complete_graph(num_nodes: int) -> CSRGraph:
+    """
+    Complete graph on num_nodes nodes.
+    """
+    degree = max(num_nodes - 1, 0)
+    indptr = np.arange(num_nodes + 1, dtype=np.int64) * degree
+    # row i is 0..n-1 without i: take 0..n-2 and shift every entry >= i up by one
+    cols = np.tile(np.arange(degree, dtype=np.int64), num_nodes)
+    rows = np.repeat(np.arange(num_nodes, dtype=np.int64), degree)
+    cols += cols >= rows
+    return CSRGraph(indptr, cols.astype(np.int32))
+
+
+def lattice_graph(rows: int, cols: int) -> CSRGraph:
+    """
+    2D grid graph where node r * cols + c is connected to its 4-neighborhood.
+    """
+    num_nodes = rows * cols
+    nodes = np.arange(num_nodes, dtype=np.int64)
+    right = nodes[(nodes % cols) < cols - 1]
+    down = nodes[nodes < num_nodes - cols]
+    src = np.concatenate([right, down])
+    dst = np.concatenate([right + 1, down + cols])
+    return CSRGraph.from_edges(num_nodes, src, dst)
+
+
+def barabasi_albert_graph(num_nodes: int, m: int, rng: np.random.Generator) -> CSRGraph:
+    """
+    Barabasi-Albert preferential attachment graph.
+
+    Follows the same model as networkx: start from a star on m + 1 nodes, then
+    each new node attaches to m distinct existing nodes picked uniformly from
+    the list of edge endpoints added so far (the "repeated nodes" list).
+
+    The repeated nodes list always grows by 2m entries per new node, so the
+    position of every entry is known up front. Each target entry is drawn as a
+    pointer to a uniformly random earlier entry, and all pointers are resolved
+    at once by following them until they reach a source-node entry. Nodes that
+    drew the same target twice redraw those targets until all m are distinct.
+    """
+    if m < 1 or m >= num_nodes:
+        raise ValueError(f"Barabasi-Albert graph must have m >= 1 and m < n, m = {m}, n = {num_nodes}")
+
+    # repeated nodes of the initial star: the hub (node 0) m times and nodes 1..m once each
+    initial = np.concatenate([np.zeros(m, dtype=np.int64), np.arange(1, m + 1, dtype=np.int64)])
+    sources = np.arange(m + 1, num_nodes, dtype=np.int64)
+    num_new = len(sources)
+
+    # layout of the repeated nodes list: the initial 2m entries, then per new node m targets and m sources
+    size = 2 * m + 2 * m * num_new
+    values = np.full(size, -1, dtype=np.int64)
+    values[:2 * m] = initial
+    offsets = 2 * m + 2 * m * np.arange(num_new, dtype=np.int64)
+    target_slots = (offsets[:, None] + np.arange(m)).ravel()
+    source_slots = (offsets[:, None] + m + np.arange(m)).ravel()
+    values[source_slots] = np.repeat(sources, m)
+
+    # each target slot points to a uniformly random entry among those present when its node was added
+    pointers = np.full(size, -1, dtype=np.int64)
+    limits = np.repeat(offsets, m)
+
+    targets = np.empty((num_new, m), dtype=np.int64)
+    redraw = np.arange(len(target_slots))
+    while len(redraw) > 0:
+        pointers[target_slots[redraw]] = (rng.random(len(redraw)) * limits[redraw]).astype(np.int64)
+        targets = _resolve_pointers(values, pointers, target_slots).reshape(num_new, m)
+
+        # redraw all but the first occurrence of any target repeated within a node
+        order = np.argsort(targets, axis=1, kind="stable")
+        sorted_targets = np.take_along_axis(targets, order, axis=1)
+        repeated = np.zeros_like(targets, dtype=bool)
+        np.put_along_axis(repeated, order[:, 1:], sorted_targets[:, 1:] == sorted_targets[:, :-1], axis=1)
+        redraw = np.flatnonzero(repeated.ravel())
+
+    src = np.concatenate([np.zeros(m, dtype=np.int64), np.repeat(sources, m)])
+    dst = np.concatenate([np.arange(1, m + 1, dtype=np.int64), targets.ravel()])
+    return CSRGraph.from_edges(num_nodes, src, dst)
+
+
+def _resolve_pointers(values: np.ndarray, pointers: np.ndarray, slots: np.ndarray) -> np.ndarray:
+    # follow each slot's pointer chain back to an entry with a known node
+    current = pointers[slots]
+    resolved = values[current]
+    pending = np.flatnonzero(resolved < 0)
+    while len(pending) > 0:
+        current[pending] = pointers[current[pending]]
+        resolved[pending] = values[current[pending]]
+        pending = pending[resolved[pending] < 0]
+    return resolved
+
+
+def read_mtx_graph(file_path: str) -> CSRGraph:
+    """
+    Read an undirected graph from a MatrixMarket coordinate file with 1-based node IDs.
+    """
+    with open(file_path, 'r') as f:
+        f.readline() # Read file header
+        line = f.readline() # Number of vertices and edges
+        if not line:
+            raise ValueError(f"Illegal format for input: {file_path}")
+        num_vertices = int(line.split(" ")[0])
+        edges = np.loadtxt(f, dtype=np.int64, usecols=(0, 1), ndmin=2)
+    return CSRGraph.from_edges(num_vertices, edges[:, 0] - 1, edges[:, 1] - 1)
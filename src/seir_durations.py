@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class DurationDistribution:
+    """
+    Distribution of the number of steps an agent spends in a state.
+
+    Subclasses draw real-valued durations in _draw; sample() rounds them up to
+    whole steps, with a minimum of one, the same way SEIRAgent always has.
+    Draws use numpy's global random state like the rest of the simulation.
+    """
+
+    def sample(self, size=None) -> np.ndarray:
+        """
+        Draw countdowns in steps.
+
+        Args:
+            size: Output shape, e.g. the number of agents or (runs, agents);
+                None draws a single value
+
+        Returns:
+            Integer array of countdowns, each at least 1
+        """
+        return np.maximum(np.ceil(self._draw(size)), 1).astype(np.int64)
+
+    def _draw(self, size):
+        raise NotImplementedError
+
+
+class LognormalDuration(DurationDistribution):
+    def __init__(self, mu: float, sigma: float):
+        self.mu = mu
+        self.sigma = sigma
+
+    def _draw(self, size):
+        return np.random.lognormal(self.mu, self.sigma, size)
+
+    def __repr__(self):
+        return f"LognormalDuration(mu={self.mu}, sigma={self.sigma})"
+
+
+class GammaDuration(DurationDistribution):
+    def __init__(self, shape: float, scale: float):
+        self.shape = shape
+        self.scale = scale
+
+    def _draw(self, size):
+        return np.random.gamma(self.shape, self.scale, size)
+
+    def __repr__(self):
+        return f"GammaDuration(shape={self.shape}, scale={self.scale})"
+
+
+class ErlangDuration(GammaDuration):
+    """
+    Sum of k exponential stages with the given rate per step.
+    """
+
+    def __init__(self, k: int, rate: float):
+        if int(k) != k or k < 1:
+            raise ValueError(f"Erlang duration needs a positive integer k, got {k}")
+        super().__init__(int(k), 1 / rate)
+        self.k = int(k)
+        self.rate = rate
+
+    def __repr__(self):
+        return f"ErlangDuration(k={self.k}, rate={self.rate})"
+
+
+class EmpiricalDuration(DurationDistribution):
+    """
+    Durations drawn from a histogram of observed values.
+    """
+
+    def __init__(self, values: list[int], weights: list[float]):
+        if len(values) != len(weights) or not values:
+            raise ValueError("Empirical duration needs matching, non-empty values and weights")
+        if min(values) < 1:
+            raise ValueError(f"Empirical duration values must be at least 1 step, got {min(values)}")
+        self.values = np.asarray(values, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.probabilities = self.weights / self.weights.sum()
+
+    def _draw(self, size):
+        return np.random.choice(self.values, size=size, p=self.probabilities)
+
+    def __repr__(self):
+        return f"EmpiricalDuration(values={self.values.tolist()}, weights={self.weights.tolist()})"
+
+
+# distributions SEIRAgent has always used
+DEFAULT_EXPOSED_DURATION = LognormalDuration(1.0, 1.0)
+DEFAULT_INFECTIOUS_SIGMA = 0.105
+
+
+def duration_from_config(config, default: DurationDistribution) -> DurationDistribution:
+    """
+    Build a duration distribution from its YAML config.
+
+    Args:
+        config: None for the default, or a mapping with a 'distribution' key
+            ('lognormal', 'gamma', 'erlang' or 'empirical') and its parameters
+        default: Distribution to use when config is None
+
+    Returns:
+        The configured duration distribution
+    """
+    if config is None:
+        return default
+
+    distribution = config.get('distribution', 'lognormal')
+    if distribution == 'lognormal':
+        return LognormalDuration(config['mu'], config['sigma'])
+    elif distribution == 'gamma':
+        return GammaDuration(config['shape'], config['scale'])
+    elif distribution == 'erlang':
+        return ErlangDuration(config['k'], config['rate'])
+    elif distribution == 'empirical':
+        return EmpiricalDuration(config['values'], config['weights'])
+    raise ValueError(f"Unknown duration distribution: {distribution}")
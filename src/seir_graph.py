@@ -1,224 +1,255 @@
 import random
 
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import networkx as nx
 import numpy as np
 
-from seir_agent import SEIRState, SEIRAgent, color_map
-from seir_config import GraphType, SEIRConfig
+from seir_agent import SEIRState, color_map, infectious_prob
+from seir_config import EngineType, GraphType, SEIRConfig
+from seir_csr_graph import barabasi_albert_graph, circulant_graph, complete_graph, lattice_graph, read_mtx_graph
+from seir_graph_cache import SEIRGraphCache
+from seir_mean_field import SEIRMeanFieldGraph
+from seir_output_writer import SEIROutputWriter
 from seir_population_state import SEIRPopulationState
+from seir_render import edge_segments, render_graph
+from seir_simulation import SEIRSimulation
+
+# node colors indexed by SEIRState value
+NODE_COLORS = [color_map[state] for state in SEIRState]
+
+class SEIRGraph(SEIRSimulation):
+    def __init__(self, config: SEIRConfig, writer: SEIROutputWriter = None):
+        super().__init__(config, writer)
+
+        self.cache = None
+        self.cache_key = None
+        if self.config.cache_enabled:
+            self.cache = SEIRGraphCache(self.config.cache_dir, self.config.cache_max_bytes)
+            self.cache_spec = self.cache.spec_for(self.config)
+            if self.cache_spec is not None:
+                self.cache_key = self.cache.key_for(self.cache_spec)
+
+        # drawn even on a cache hit so the rest of the run sees the same random stream
+        graph_seed = random.getrandbits(64)
+        # seeds the layout, so it does not depend on when (or whether) it is computed
+        self.layout_seed = graph_seed % 2**32
+        # built on first use, see nx_graph and pos
+        self._nx_graph = None
+        self._pos = None
+        cached = self.cache.load_graph(self.cache_key) if self.cache_key is not None else None
+        if cached is not None:
+            self.graph, self._pos = cached
+        else:
+            self.graph = self._build_graph(graph_seed)
+            if self.cache_key is not None:
+                self.cache.store_graph(self.cache_key, self.cache_spec, self.graph)
+
+        num_nodes = self.graph.number_of_nodes()
+        # the Dublin graph's size comes from its data file, not the config
+        self.num_agents = num_nodes
+
+        # the population is held in arrays indexed by node rather than one SEIRAgent per node;
+        # every agent's countdowns are sampled up front, as SEIRAgent does
+        self.states = np.full(num_nodes, SEIRState.SUSCEPTIBLE.value, dtype=np.int8)
+        self.countdown_to_infectious = self.config.exposed_distribution.sample(num_nodes)
+        self.countdown_to_recovered = self.config.infectious_distribution.sample(num_nodes)
+        # a susceptible agent's own days_spent_infectious is always 0 (see SEIRAgent.get_infectious_prob)
+        self.p_infect = infectious_prob(self.config.p1_c, self.config.beta, 0)
+        # source node of every CSR entry, so neighbor states can be gathered per edge
+        self.edge_src = np.repeat(np.arange(num_nodes, dtype=self.graph.indices.dtype), self.graph.degrees())
 
-class SEIRGraph:
-    def __init__(self, config: SEIRConfig):
-        self.config = config
-        self.seed = config.seed
-        if self.seed is not None and self.config.set_seed:
-            random.seed(self.seed)
-        self.graph = self._build_graph()
-        self.agents = [SEIRAgent(i, self.config.p1_c, self.config.beta) for i in range(self.graph.number_of_nodes())]
         # set the initial population based on the config
         
         # sample the initial population
         exposed_agents = random.sample(
-            self.agents,
+            range(num_nodes),
             int(self.config.num_agents * self.config.exposed_percent)
         )
         infectious_agents = random.sample(
-            self.agents,
+            range(num_nodes),
             int(self.config.num_agents * self.config.infectious_percent)
         )
 
         # set the initial state of the agents
-        for agent in exposed_agents:
-            agent.state = SEIRState.EXPOSED
-        for agent in infectious_agents:
-            agent.state = SEIRState.INFECTIOUS
-
-        self._set_neighbors()
-
-        self.susceptible_counts = []
-        self.exposed_counts = []
-        self.infectious_counts = []
-        self.recovered_counts = []
-
-        self.step_count = 0
-        self.peak_infections = 0
-        self.time_to_peak = 0
-        self.time_to_steady_state = None
-        self.save_graph_state()
+        self.states[exposed_agents] = SEIRState.EXPOSED.value
+        self.states[infectious_agents] = SEIRState.INFECTIOUS.value
+
+        self._segments = None
+        self._record_initial_state()
+
+    @property
+    def nx_graph(self) -> nx.Graph:
+        # only the layout and the distance metrics need networkx, and a cache hit usually needs neither
+        if self._nx_graph is None:
+            self._nx_graph = self.graph.to_networkx()
+        return self._nx_graph
+
+    @property
+    def pos(self) -> np.ndarray:
+        # the layout is only needed to draw graph images
+        if self._pos is None:
+            self._pos = self._compute_layout()
+            if self.cache_key is not None:
+                self.cache.store_layout(self.cache_key, self._pos)
+        return self._pos
+
+    def _compute_layout(self):
         if self.config.graph_type == GraphType.CIRCULANT:
-            self.pos = nx.circular_layout(self.graph)
+            pos = nx.circular_layout(self.nx_graph)
         elif self.config.graph_type == GraphType.COMPLETE:
-            self.pos = nx.spring_layout(self.graph)
+            pos = nx.spring_layout(self.nx_graph, seed=self.layout_seed)
         elif self.config.graph_type == GraphType.LATTICE:
-            self.pos = nx.spring_layout(self.graph)
+            pos = nx.spring_layout(self.nx_graph, seed=self.layout_seed)
         elif self.config.graph_type == GraphType.SCALE_FREE:
-            self.pos = nx.spring_layout(self.graph)
+            pos = nx.spring_layout(self.nx_graph, seed=self.layout_seed)
         elif self.config.graph_type == GraphType.INFECT_DUBLIN:
-            self.pos = nx.spring_layout(self.graph)
-        self.draw_graph()
+            pos = nx.spring_layout(self.nx_graph, seed=self.layout_seed)
+        # store positions as an (n, 2) array indexed by node so they can be cached
+        return np.array([pos[node] for node in range(self.graph.number_of_nodes())])
 
-    def _build_graph(self):
+    def _build_graph(self, graph_seed: int):
         if self.config.graph_type == GraphType.CIRCULANT:
-            return nx.circulant_graph(self.config.num_agents, list(range(1, self.config.num_neighbors // 2 + 1)))
+            return circulant_graph(self.config.num_agents, list(range(1, self.config.num_neighbors // 2 + 1)))
         elif self.config.graph_type == GraphType.COMPLETE:
-            return nx.complete_graph(self.config.num_agents)
+            return complete_graph(self.config.num_agents)
         elif self.config.graph_type == GraphType.LATTICE:
-            return nx.grid_2d_graph(self.config.lattice_rows, self.config.lattice_cols)
+            return lattice_graph(self.config.lattice_rows, self.config.lattice_cols)
         elif self.config.graph_type == GraphType.SCALE_FREE:
-            return nx.barabasi_albert_graph(self.config.num_agents, self.config.m)
+            # seeded from the run RNG so set_seed makes the graph reproducible
+            rng = np.random.default_rng(graph_seed)
+            return barabasi_albert_graph(self.config.num_agents, self.config.m, rng)
         elif self.config.graph_type == GraphType.INFECT_DUBLIN:
-            return self._read_graph_from_file(self.config.dublin_path)
-
-    def _read_graph_from_file(self, file_path: str):
-        fo = open(file_path, 'r')
-        line = fo.readline() # Read file header
-        line = fo.readline() # Number of vertices and edges
-        if not line:
-            print('error -- illegal format for input')
-            return
-        v = line.split(" ")
-        numVertices = int(v[0])
-        G = nx.Graph()
-        G.add_nodes_from(range(1,numVertices+1))
-        while True:
-            line = fo.readline()
-            if not line:
-                break
-            v = line.split(" ")
-            v1 = int(v[0])
-            v2 = int(v[1])
-            G.add_edge(v1,v2)
-            G.add_edge(v2,v1)
-        fo.close()
-        return G
-
-    def _set_neighbors(self):
-        if self.config.graph_type == GraphType.LATTICE:
-            for node in self.graph.nodes:
-                row, col = node
-                neighbors = [self.agents[nr * self.config.lattice_cols + nc] for nr, nc in self.graph.neighbors(node)]
-                self.agents[row * self.config.lattice_cols + col].set_neighbors(neighbors)
-        elif self.config.graph_type == GraphType.INFECT_DUBLIN:
-            for node in self.graph.nodes:
-                neighbors_idx = list(self.graph.neighbors(node))
-                neighbors = [self.agents[i-1] for i in neighbors_idx]
-                self.agents[node-1].set_neighbors(neighbors)
-        else:
-            for node in self.graph.nodes:
-                neighbors_idx = list(self.graph.neighbors(node))
-                neighbors = [self.agents[i] for i in neighbors_idx]
-                self.agents[node].set_neighbors(neighbors)
-
-    def step(self):
-        self.step_count += 1
-        changed_nodes = []
-        for i, agent in enumerate(self.agents):
-            agent_state = agent.state
-            agent.step()
-            if agent_state != agent.state:
-                changed_nodes.append(i)
-
-        # Track peak infections
-        current_infectious = sum(1 for agent in self.agents if agent.state == SEIRState.INFECTIOUS)
-        if current_infectious > self.peak_infections:
-            self.peak_infections = current_infectious
-            self.time_to_peak = self.step_count
-
-        # Check for steady state: no exposed or infectious agents remain
-        current_exposed = sum(1 for agent in self.agents if agent.state == SEIRState.EXPOSED)
-        if self.time_to_steady_state is None and current_exposed == 0 and current_infectious == 0:
-            self.time_to_steady_state = self.step_count
-
-        self.save_graph_state()
-        self.draw_graph()
-
-    def run(self, num_steps: int = None):
-        if num_steps is None:
-            num_steps = self.config.num_steps
-        for _ in range(num_steps):
-            self.step()
-        self.describe_graph()
+            return read_mtx_graph(self.config.dublin_path)
+
+    def _advance(self):
+        # Same update as calling SEIRAgent.step on every agent in index order. Exposed and
+        # infectious agents only follow their own countdowns, so their new states can be
+        # computed first; a susceptible agent then sees the new state of lower-indexed
+        # neighbors (already stepped) and the old state of the rest.
+        infectious_before = self.states == SEIRState.INFECTIOUS.value
+        exposed = self.states == SEIRState.EXPOSED.value
+
+        self.countdown_to_infectious[exposed] -= 1
+        becomes_infectious = exposed & (self.countdown_to_infectious == 0)
+        self.countdown_to_recovered[infectious_before] -= 1
+        recovers = infectious_before & (self.countdown_to_recovered == 0)
+        infectious_after = (infectious_before & ~recovers) | becomes_infectious
+
+        # count the infectious neighbors each susceptible agent sees
+        susceptible = self.states == SEIRState.SUSCEPTIBLE.value
+        src = self.edge_src
+        dst = self.graph.indices
+        contacts = susceptible[src] & np.where(dst < src, infectious_after[dst], infectious_before[dst])
+        num_contacts = np.bincount(src[contacts], minlength=len(self.states))
+
+        # exposed unless every infectious contact fails
+        candidates = np.flatnonzero(num_contacts)
+        p_exposed = 1 - (1 - self.p_infect) ** num_contacts[candidates]
+        newly_exposed = candidates[np.random.random(len(candidates)) < p_exposed]
+
+        self.states[becomes_infectious] = SEIRState.INFECTIOUS.value
+        self.states[recovers] = SEIRState.RECOVERED.value
+        self.states[newly_exposed] = SEIRState.EXPOSED.value
+
+    def count_states(self) -> list[int]:
+        # S/E/I/R counts indexed by SEIRState value
+        return np.bincount(self.states, minlength=len(SEIRState)).tolist()
 
     # save the population state at each step and then plot/animate it after simulation ends
     def save_graph_state(self):
         population_state = SEIRPopulationState()
-        for i, agent in enumerate(self.agents):
-            if agent.state == SEIRState.SUSCEPTIBLE:
-                population_state.susceptible_nodes.append(i)
-            elif agent.state == SEIRState.EXPOSED:
-                population_state.exposed_nodes.append(i)
-            elif agent.state == SEIRState.INFECTIOUS:
-                population_state.infectious_nodes.append(i)
-            elif agent.state == SEIRState.RECOVERED:
-                population_state.recovered_nodes.append(i)
-        population_state.save(self.config.out_dir + "graph_state/" + str(self.step_count) + ".json")
+        population_state.susceptible_nodes = np.flatnonzero(self.states == SEIRState.SUSCEPTIBLE.value).tolist()
+        population_state.exposed_nodes = np.flatnonzero(self.states == SEIRState.EXPOSED.value).tolist()
+        population_state.infectious_nodes = np.flatnonzero(self.states == SEIRState.INFECTIOUS.value).tolist()
+        population_state.recovered_nodes = np.flatnonzero(self.states == SEIRState.RECOVERED.value).tolist()
+        path = self.out_dir + "graph_state/" + str(self.step_count) + self.config.graph_state_ext
+        self.writer.submit(population_state.save, path)
 
     def draw_graph(self):
-        # save the graph image
-        nx.draw(self.graph, self.pos, node_size=50, node_color=[color_map[agent.state] for agent in self.agents])
-        plt.savefig(self.config.out_dir + "graph_images/" + str(self.step_count) + ".png")
-        plt.close()
-
-    def describe_graph(self):
-        # Please include the following
-        # information about each network: a figure or a description of the degree distribution, the maximum degree, the average degree, the diameter of the graph, the radius of the graph, and the density (connectance) of the graph
-
-        # plot the degree distribution
-        degrees = [self.graph.degree(node) for node in self.graph.nodes]
-        plt.hist(degrees, bins=range(max(degrees) + 1))
-        plt.xlabel("Degree")
-        plt.ylabel("Frequency")
-        plt.title("Degree Distribution")
-        plt.savefig(self.config.out_dir + "degree_distribution.png")
-        plt.close()
-
-        def get_degree_count_dictionary(G):
+        if not self.config.render_images:
+            return
+        if self._segments is None:
+            self._segments = edge_segments(self.graph.indptr, self.graph.indices, self.pos)
+        # snapshot the colors now, render and save the graph image in a render process
+        node_color = [NODE_COLORS[state] for state in self.states.tolist()]
+        path = self.out_dir + "graph_images/" + str(self.step_count) + ".png"
+        self.writer.submit_render(render_graph, path, self.pos, self._segments, node_color)
+
+    def _describe_topology(self) -> dict:
+        degrees = self.graph.degrees().tolist()
+        metrics = None
+        if self.cache_key is not None:
+            metrics = self.cache.load_description(self.cache_key, self.out_dir)
+        # a cached description without the distance metrics is recomputed once they are wanted
+        if metrics is None or (self.config.distance_metrics and metrics["diameter"] is None):
+            metrics = self._compute_topology(degrees)
+            if self.cache_key is not None:
+                self.cache.store_description(self.cache_key, metrics, self.out_dir)
+        return dict(metrics, degree_distribution=degrees)
+
+    def _compute_topology(self, degrees: list[int]) -> dict:
+        # plot the degree distribution and compute the metrics that only depend on the graph
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.hist(degrees, bins=range(max(degrees) + 1))
+        ax.set_xlabel("Degree")
+        ax.set_ylabel("Frequency")
+        ax.set_title("Degree Distribution")
+        fig.savefig(self.out_dir + "degree_distribution.png")
+
+        def get_degree_count_dictionary(degrees):
             degree_counts = {}
-            for node in G.nodes():
-                degree = G.degree(node)
+            for degree in degrees:
                 if degree in degree_counts:
                     degree_counts[degree] += 1
                 else:
                     degree_counts[degree] = 1
             return degree_counts
 
-        degree_pairs: dict[int,int] = sorted(get_degree_count_dictionary(self.graph).items())
+        degree_pairs: dict[int,int] = sorted(get_degree_count_dictionary(degrees).items())
         x = [degree for degree, _ in degree_pairs]
         y = [count for _, count in degree_pairs]
         if 0 not in x:
             x.insert(0,0)
             y.insert(0,0)
         y = y / np.sum(y)
-        plt.loglog(x,y,'b-o')
-        plt.xlabel('Node degree')
-        plt.ylabel('Probability')
-        plt.savefig(self.config.out_dir + "degree_distribution_loglog.png")
-        plt.close()
-
-        def get_uninfected_nodes():
-            uninfected_nodes = []
-            for i, agent in enumerate(self.agents):
-                if agent.state == SEIRState.SUSCEPTIBLE:
-                    uninfected_nodes.append(i)
-            return len(uninfected_nodes)
-
-        # save the rest of the information to a file
-        with open(self.config.out_dir + "graph_description.txt", "w") as f:
-            f.write("Degree Distribution: " + str(degrees) + "\n")
-            f.write("Maximum Degree: " + str(max(degrees)) + "\n")
-            f.write("Average Degree: " + str(sum(degrees) / len(degrees)) + "\n")
-            f.write("Diameter: " + str(nx.diameter(self.graph)) + "\n")
-            f.write("Radius: " + str(nx.radius(self.graph)) + "\n")
-            f.write("Density: " + str(nx.density(self.graph)) + "\n")
-            f.write("Uninfected nodes: " + str(get_uninfected_nodes()) + "\n")
-            f.write("Peak Infections: " + str(self.peak_infections) + "\n")
-            f.write("Time to Peak: " + str(self.time_to_peak) + "\n")
-            # Write time to steady state if it was reached, otherwise write "Not reached"
-            if self.time_to_steady_state is not None:
-                f.write("Time to Steady State: " + str(self.time_to_steady_state) + "\n")
-            else:
-                f.write("Time to Steady State: Not reached\n")
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.loglog(x,y,'b-o')
+        ax.set_xlabel('Node degree')
+        ax.set_ylabel('Probability')
+        fig.savefig(self.out_dir + "degree_distribution_loglog.png")
+
+        # density from the edge count, same as nx.density; the distance metrics need all-pairs BFS in networkx
+        n = self.graph.number_of_nodes()
+        return {
+            "degree_counts": {str(degree): count for degree, count in degree_pairs},
+            "max_degree": max(degrees),
+            "average_degree": sum(degrees) / len(degrees),
+            "diameter": nx.diameter(self.nx_graph) if self.config.distance_metrics else None,
+            "radius": nx.radius(self.nx_graph) if self.config.distance_metrics else None,
+            "density": 2 * self.graph.number_of_edges() / (n * (n - 1)) if n > 1 else 0,
+        }
+
+def build_seir_graph(config: SEIRConfig, writer: SEIROutputWriter = None):
+    """
+    Create the simulation engine for a config.
+
+    The default "auto" engine uses the count-based SEIRMeanFieldGraph for
+    complete graphs with more than mean_field_threshold agents, where building
+    the N(N-1)/2 edges dominates the run, or when graph images are turned off.
+    It draws no graph images, so smaller complete graphs and every other
+    topology use the agent-based SEIRGraph.
+    """
+    engine = config.engine
+    if engine == EngineType.AUTO:
+        use_mean_field = config.graph_type == GraphType.COMPLETE and (
+            config.num_agents > config.mean_field_threshold or not config.render_images
+        )
+        engine = EngineType.MEAN_FIELD if use_mean_field else EngineType.AGENT
+    if engine == EngineType.MEAN_FIELD:
+        return SEIRMeanFieldGraph(config, writer)
+    return SEIRGraph(config, writer)
 
 if __name__ == "__main__":
     graph = SEIRGraph(SEIRConfig("config/example.yaml"))
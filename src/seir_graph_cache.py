@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of built graphs and their derived artifacts.
+
+Each entry is a directory named by a hash of the graph spec (the config's
+graph section, the number of agents and, for random topologies, the seed). It
+holds the CSR adjacency, the drawing layout once a run has drawn the graph,
+the graph metrics written by describe_graph and the degree distribution
+figures, so repeated experiments
+skip all topology work after the first run. Entries are evicted least recently
+used first once the cache grows past its size limit.
+
+Run this file directly to inspect or prune the cache.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+
+import numpy as np
+
+from seir_config import GraphType, SEIRConfig
+from seir_csr_graph import CSRGraph
+
+# bump when the layout of cache entries changes so stale entries are never read
+CACHE_VERSION = 1
+
+DEGREE_FIGURES = ["degree_distribution.png", "degree_distribution_loglog.png"]
+
+
+class SEIRGraphCache:
+    """
+    Content-addressed cache of graphs, layouts and graph descriptions.
+
+    Args:
+        cache_dir: Directory holding one subdirectory per cache entry
+        max_bytes: Total size above which least recently used entries are evicted
+    """
+
+    def __init__(self, cache_dir: str = "cache/graphs", max_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def spec_for(config: SEIRConfig) -> dict | None:
+        """
+        Describe everything the graph depends on, or None if it cannot be cached.
+
+        Scale-free graphs are random, so they are only cached when the run is
+        seeded. The Dublin graph is keyed by the contents of its data file.
+        """
+        spec = {
+            "version": CACHE_VERSION,
+            "graph": config.config['graph'],
+            "num_agents": config.num_agents,
+            "seed": None,
+        }
+        if config.graph_type == GraphType.SCALE_FREE:
+            if not config.set_seed or config.seed is None:
+                return None
+            spec["seed"] = config.seed
+        elif config.graph_type == GraphType.INFECT_DUBLIN:
+            with open(config.dublin_path, 'rb') as f:
+                spec["data_sha256"] = hashlib.sha256(f.read()).hexdigest()
+        return spec
+
+    @staticmethod
+    def key_for(spec: dict) -> str:
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:32]
+
+    def load_graph(self, key: str):
+        """
+        Return the cached (graph, layout) for a key, or None on a miss.
+
+        The layout is None if no run has drawn the graph yet.
+        """
+        entry = self.cache_dir / key
+        try:
+            with np.load(entry / "graph.npz") as data:
+                graph = CSRGraph(data["indptr"], data["indices"])
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return None
+        try:
+            pos = np.load(entry / "layout.npy")
+        except (FileNotFoundError, OSError, ValueError):
+            pos = None
+        self._touch(entry)
+        return graph, pos
+
+    def store_graph(self, key: str, spec: dict, graph: CSRGraph, pos: np.ndarray = None):
+        entry = self.cache_dir / key
+        entry.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(entry / "spec.json", lambda f: f.write(json.dumps(spec, indent=4).encode()))
+        self._write_atomic(entry / "graph.npz", lambda f: np.savez(f, indptr=graph.indptr, indices=graph.indices))
+        if pos is not None:
+            self._write_atomic(entry / "layout.npy", lambda f: np.save(f, pos))
+        self.evict(keep=key)
+
+    def store_layout(self, key: str, pos: np.ndarray):
+        entry = self.cache_dir / key
+        entry.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(entry / "layout.npy", lambda f: np.save(f, pos))
+        self.evict(keep=key)
+
+    def load_description(self, key: str, out_dir: str) -> dict | None:
+        """
+        Copy the cached degree distribution figures into out_dir and return the
+        cached graph metrics, or return None on a miss.
+        """
+        entry = self.cache_dir / key
+        try:
+            with open(entry / "metrics.json", 'r') as f:
+                metrics = json.load(f)
+            for name in DEGREE_FIGURES:
+                shutil.copyfile(entry / name, Path(out_dir) / name)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        self._touch(entry)
+        return metrics
+
+    def store_description(self, key: str, metrics: dict, out_dir: str):
+        entry = self.cache_dir / key
+        entry.mkdir(parents=True, exist_ok=True)
+        for name in DEGREE_FIGURES:
+            source = Path(out_dir) / name
+            self._write_atomic(entry / name, lambda f: f.write(source.read_bytes()))
+        # written last so a partially stored description is never read
+        self._write_atomic(entry / "metrics.json", lambda f: f.write(json.dumps(metrics, indent=4).encode()))
+        self.evict(keep=key)
+
+    def entries(self) -> list[dict]:
+        """
+        List cache entries, least recently used first.
+        """
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                spec = json.loads((entry / "spec.json").read_text())
+            except (FileNotFoundError, ValueError):
+                spec = None
+            entries.append({
+                "key": entry.name,
+                "path": entry,
+                "size": sum(f.stat().st_size for f in entry.iterdir() if f.is_file()),
+                "last_used": entry.stat().st_mtime,
+                "spec": spec,
+                "has_description": (entry / "metrics.json").exists(),
+            })
+        return sorted(entries, key=lambda e: e["last_used"])
+
+    def evict(self, max_bytes: int = None, keep: str = None) -> list[str]:
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns the keys of the removed entries.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = self.entries()
+        total = sum(e["size"] for e in entries)
+        removed = []
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            if entry["key"] == keep:
+                continue
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry["size"]
+            removed.append(entry["key"])
+        return removed
+
+    def clear(self) -> list[str]:
+        return self.evict(max_bytes=0)
+
+    @staticmethod
+    def _touch(entry: Path):
+        # the entry directory's mtime doubles as its last-used time for LRU eviction
+        os.utime(entry)
+
+    @staticmethod
+    def _write_atomic(path: Path, write):
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect and prune the on-disk graph artifact cache"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="cache/graphs",
+        help="Directory containing the graph cache (default: 'cache/graphs')"
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List cache entries, least recently used first")
+
+    prune_parser = subparsers.add_parser("prune", help="Evict least recently used entries")
+    prune_parser.add_argument(
+        "--max-size-mb",
+        type=float,
+        required=True,
+        help="Evict entries until the cache is at most this many megabytes"
+    )
+
+    subparsers.add_parser("clear", help="Remove every cache entry")
+
+    args = parser.parse_args()
+    cache = SEIRGraphCache(args.cache_dir)
+
+    if args.command == "list":
+        entries = cache.entries()
+        for entry in entries:
+            spec = entry["spec"] or {}
+            graph = spec.get("graph", {})
+            last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_used"]))
+            description = "graph + description" if entry["has_description"] else "graph"
+            print(f"{entry['key']}  {format_size(entry['size']):>10}  {last_used}  "
+                  f"{graph.get('type', '?')} n={spec.get('num_agents', '?')} seed={spec.get('seed')}  ({description})")
+        total = sum(e["size"] for e in entries)
+        print(f"{len(entries)} entries, {format_size(total)} in {cache.cache_dir}")
+
+    elif args.command == "prune":
+        removed = cache.evict(max_bytes=int(args.max_size_mb * 1024 * 1024))
+        print(f"Removed {len(removed)} entries from {cache.cache_dir}")
+
+    elif args.command == "clear":
+        removed = cache.clear()
+        print(f"Removed {len(removed)} entries from {cache.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
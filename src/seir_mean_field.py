@@ -0,0 +1,140 @@
+import random
+
+from matplotlib.figure import Figure
+import numpy as np
+
+from seir_agent import infectious_prob
+from seir_config import GraphType, SEIRConfig
+from seir_output_writer import SEIROutputWriter
+from seir_population_state import SEIRPopulationState
+from seir_simulation import SEIRSimulation
+
+class SEIRMeanFieldGraph(SEIRSimulation):
+    """
+    Count-based SEIR engine for complete graphs.
+
+    On a complete graph every susceptible agent is a neighbor of every
+    infectious agent, so its chance of exposure in a step depends only on the
+    number of infectious agents. Instead of building the edge list and a state
+    per node, this engine tracks how many exposed and infectious agents have
+    each number of days left in their countdown, and draws the new exposures
+    for the whole susceptible compartment from a few binomials.
+    """
+
+    def __init__(self, config: SEIRConfig, writer: SEIROutputWriter = None):
+        if config.graph_type != GraphType.COMPLETE:
+            raise ValueError(f"Mean-field engine only supports complete graphs, got {config.graph_type.value}")
+        super().__init__(config, writer)
+
+        # a susceptible agent's own days_spent_infectious is always 0 (see SEIRAgent.get_infectious_prob)
+        self.p_infect = infectious_prob(self.config.p1_c, self.config.beta, 0)
+
+        # sample the initial population the same way SEIRGraph does; agents drawn as both end up infectious
+        exposed_agents = set(random.sample(
+            range(self.num_agents),
+            int(self.config.num_agents * self.config.exposed_percent)
+        ))
+        infectious_agents = set(random.sample(
+            range(self.num_agents),
+            int(self.config.num_agents * self.config.infectious_percent)
+        ))
+        num_exposed = len(exposed_agents - infectious_agents)
+        num_infectious = len(infectious_agents)
+
+        # countdown histograms: index c holds the number of agents with c steps left in the state
+        self.exposed_countdowns = self._add_countdowns(np.zeros(1, dtype=np.int64), self.config.exposed_distribution.sample(num_exposed))
+        self.infectious_countdowns = self._add_countdowns(np.zeros(1, dtype=np.int64), self.config.infectious_distribution.sample(num_infectious))
+        self.num_susceptible = self.num_agents - num_exposed - num_infectious
+        self.num_recovered = 0
+
+        self._record_initial_state()
+
+    @staticmethod
+    def _add_countdowns(countdowns: np.ndarray, samples: np.ndarray) -> np.ndarray:
+        added = np.bincount(samples, minlength=len(countdowns))
+        if len(added) > len(countdowns):
+            countdowns = np.pad(countdowns, (0, len(added) - len(countdowns)))
+        countdowns[:len(added)] += added
+        return countdowns
+
+    @staticmethod
+    def _tick(countdowns: np.ndarray) -> int:
+        # decrement every countdown by one and return how many reached zero
+        finished = int(countdowns[1]) if len(countdowns) > 1 else 0
+        countdowns[:-1] = countdowns[1:]
+        countdowns[0] = 0
+        countdowns[-1] = 0
+        return finished
+
+    def _sample_exposures(self, num_infectious: int, new_infectious: int, new_recovered: int) -> int:
+        # SEIRGraph steps agents in index order, so a susceptible agent also sees this step's
+        # transitions of lower-indexed agents. Place the transitioning agents at uniform random
+        # positions among the susceptibles; each gap between them sees its own infectious count.
+        if self.num_susceptible == 0:
+            return 0
+        changes = np.concatenate([np.ones(new_infectious, dtype=np.int64), -np.ones(new_recovered, dtype=np.int64)])
+        np.random.shuffle(changes)
+        seen = num_infectious + np.concatenate([[0], np.cumsum(changes)])
+        positions = np.sort(np.random.random(len(changes)))
+        gap_lengths = np.diff(np.concatenate([[0.0], positions, [1.0]]))
+        gap_susceptible = np.random.multinomial(self.num_susceptible, gap_lengths)
+
+        # each susceptible agent is exposed unless every infectious contact fails
+        p_exposed = 1 - (1 - self.p_infect) ** seen
+        return int(np.random.binomial(gap_susceptible, p_exposed).sum())
+
+    @property
+    def num_exposed(self) -> int:
+        return int(self.exposed_countdowns.sum())
+
+    @property
+    def num_infectious(self) -> int:
+        return int(self.infectious_countdowns.sum())
+
+    def count_states(self) -> list[int]:
+        return [self.num_susceptible, self.num_exposed, self.num_infectious, self.num_recovered]
+
+    def _advance(self):
+        num_infectious = self.num_infectious
+        new_infectious = self._tick(self.exposed_countdowns)
+        new_recovered = self._tick(self.infectious_countdowns)
+        new_exposed = self._sample_exposures(num_infectious, new_infectious, new_recovered)
+
+        self.infectious_countdowns = self._add_countdowns(self.infectious_countdowns, self.config.infectious_distribution.sample(new_infectious))
+        self.exposed_countdowns = self._add_countdowns(self.exposed_countdowns, self.config.exposed_distribution.sample(new_exposed))
+        self.num_susceptible -= new_exposed
+        self.num_recovered += new_recovered
+
+    def save_graph_state(self):
+        population_state = SEIRPopulationState.from_counts(*self.count_states())
+        path = self.out_dir + "graph_state/" + str(self.step_count) + self.config.graph_state_ext
+        self.writer.submit(population_state.save, path)
+
+    def _describe_topology(self) -> dict:
+        # every node of a complete graph has degree n - 1, so the metrics are closed-form
+        n = self.num_agents
+        degree = n - 1
+
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.bar([degree], [n], width=1)
+        ax.set_xlabel("Degree")
+        ax.set_ylabel("Frequency")
+        ax.set_title("Degree Distribution")
+        fig.savefig(self.out_dir + "degree_distribution.png")
+
+        fig = Figure()
+        ax = fig.add_subplot()
+        ax.loglog([degree], [1.0], 'b-o')
+        ax.set_xlabel('Node degree')
+        ax.set_ylabel('Probability')
+        fig.savefig(self.out_dir + "degree_distribution_loglog.png")
+
+        return {
+            "degree_distribution": {degree: n},
+            "max_degree": degree,
+            "average_degree": float(degree),
+            "diameter": 1 if n > 1 else 0,
+            "radius": 1 if n > 1 else 0,
+            "density": 1.0 if n > 1 else 0,
+        }
@@ -0,0 +1,135 @@
+"""
+Stream per-step simulation metrics over HTTP as newline-delimited JSON.
+
+The server is attached to a simulation as a step observer. Every record the
+simulation publishes is sent to each client connected to GET /metrics, so an
+experiment's epidemic curve and throughput can be watched live without
+reading anything from disk. POST /cancel stops the run that is currently
+stepping.
+
+Example:
+    curl -N http://127.0.0.1:8765/metrics
+    curl -X POST http://127.0.0.1:8765/cancel
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import queue
+import threading
+
+
+class SEIRMetricsServer:
+    """
+    HTTP server that fans step records out to streaming clients.
+
+    Publishing never blocks the simulation: each client has a bounded queue
+    and records are dropped for clients that fall too far behind.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+        client_queue_size: Maximum number of records buffered per client
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, client_queue_size: int = 1024):
+        self.client_queue_size = client_queue_size
+        self.on_cancel = None
+        self._clients = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="seir-metrics-server", daemon=True)
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._httpd.server_address[:2]
+
+    def start(self):
+        self._thread.start()
+        host, port = self.address
+        print(f"Streaming metrics at http://{host}:{port}/metrics")
+
+    def publish(self, record: dict):
+        line = (json.dumps(record) + "\n").encode()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(line)
+            except queue.Full:
+                pass
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # wake every streaming client so its connection ends cleanly
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(None)
+            except queue.Full:
+                pass
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _add_client(self) -> queue.Queue:
+        client = queue.Queue(maxsize=self.client_queue_size)
+        with self._lock:
+            self._clients.append(client)
+        return client
+
+    def _remove_client(self, client: queue.Queue):
+        with self._lock:
+            self._clients.remove(client)
+
+    def _cancel(self) -> bool:
+        if self.on_cancel is None:
+            return False
+        self.on_cancel()
+        return True
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                client = server._add_client()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.end_headers()
+                    while True:
+                        line = client.get()
+                        if line is None:
+                            break
+                        self.wfile.write(line)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._remove_client(client)
+
+            def do_POST(self):
+                if self.path != "/cancel":
+                    self.send_error(404)
+                    return
+                cancelled = server._cancel()
+                body = (json.dumps({"cancelled": cancelled}) + "\n").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # keep request logs out of the simulation's output
+                pass
+
+        return Handler
@@ -0,0 +1,114 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import queue
+import threading
+
+
+class SEIROutputWriter:
+    """
+    Background writer for simulation output.
+
+    The simulation pushes write jobs (a callable plus its arguments) onto a
+    bounded queue and keeps stepping, while a worker thread drains the queue
+    and performs the disk I/O. When the queue is full, submit() blocks until
+    the worker catches up, so memory use stays bounded.
+
+    Drawing graph images is CPU-bound and holds the GIL, so a thread gives it
+    no overlap with stepping. Jobs passed to submit_render() run in a pool of
+    separate processes instead, with the same bound on pending jobs.
+
+    Args:
+        queue_size: Maximum number of pending jobs (per kind) before submitting blocks
+        asynchronous: If False, jobs run immediately on the calling thread
+        render_processes: Number of processes for submit_render() jobs; with 0
+            they run on the writer thread like submit() jobs
+    """
+
+    def __init__(self, queue_size: int = 64, asynchronous: bool = True, render_processes: int = 0):
+        self.asynchronous = asynchronous
+        self.queue_size = queue_size
+        self._error = None
+        self._closed = False
+        self._executor = None
+        self._renders = deque()
+        if self.asynchronous:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(target=self._worker, name="seir-output-writer", daemon=True)
+            self._thread.start()
+            if render_processes > 0:
+                # spawn rather than fork: the writer and metrics server threads are already running
+                self._executor = ProcessPoolExecutor(render_processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, fn, *args):
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed output writer")
+        if not self.asynchronous:
+            fn(*args)
+            return
+        # blocks while the queue is full (backpressure)
+        self._queue.put((fn, args))
+
+    def submit_render(self, fn, *args):
+        """
+        Run a CPU-bound job, such as drawing a graph image, in a render process.
+
+        fn must be a module-level function and args must be picklable.
+        """
+        if self._executor is None:
+            self.submit(fn, *args)
+            return
+        self._raise_error()
+        if self._closed:
+            raise RuntimeError("Cannot submit to a closed output writer")
+        # reap finished renders, and wait for the oldest while too many are pending (backpressure)
+        while self._renders and (self._renders[0].done() or len(self._renders) >= self.queue_size):
+            self._collect(self._renders.popleft())
+        self._raise_error()
+        self._renders.append(self._executor.submit(fn, *args))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.asynchronous:
+            self._queue.put(None)
+            self._thread.join()
+        if self._executor is not None:
+            while self._renders:
+                self._collect(self._renders.popleft())
+            self._executor.shutdown()
+        self._raise_error()
+
+    def _collect(self, future):
+        try:
+            future.result()
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            fn, args = job
+            # keep draining after a failure so producers never block forever
+            if self._error is not None:
+                continue
+            try:
+                fn(*args)
+            except Exception as e:
+                self._error = e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,3 +1,4 @@
+import gzip
 import json
 
 
@@ -9,21 +10,48 @@ class SEIRPopulationState:
         self.exposed_nodes = []
         self.infectious_nodes = []
         self.recovered_nodes = []
+        # engines without node identities (e.g. mean-field) only record compartment counts
+        self.counts = None
     
     def __str__(self):
-        return f"Susceptible: {len(self.susceptible_nodes)}, Exposed: {len(self.exposed_nodes)}, Infectious: {len(self.infectious_nodes)}, Recovered: {len(self.recovered_nodes)}"
+        s, e, i, r = self.get_counts()
+        return f"Susceptible: {s}, Exposed: {e}, Infectious: {i}, Recovered: {r}"
+
+    @classmethod
+    def from_counts(cls, susceptible: int, exposed: int, infectious: int, recovered: int):
+        state = cls()
+        state.counts = [int(susceptible), int(exposed), int(infectious), int(recovered)]
+        return state
+
+    def get_counts(self):
+        if self.counts is not None:
+            return tuple(self.counts)
+        return (
+            len(self.susceptible_nodes),
+            len(self.exposed_nodes),
+            len(self.infectious_nodes),
+            len(self.recovered_nodes),
+        )
     
     def save(self, file_path: str):
-        with open(file_path, 'w') as f:
-            json.dump(self.__dict__, f, indent=4)
+        data = {key: value for key, value in self.__dict__.items() if value is not None}
+        # gzip when the path asks for it, so compression runs wherever save() runs
+        if file_path.endswith(".gz"):
+            with gzip.open(file_path, 'wt') as f:
+                json.dump(data, f)
+        else:
+            with open(file_path, 'w') as f:
+                json.dump(data, f, indent=4)
 
     @classmethod
     def load(cls, file_path: str):
-        with open(file_path, 'r') as f:
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, 'rt') as f:
             data = json.load(f)
             state = SEIRPopulationState()
             state.susceptible_nodes = data['susceptible_nodes']
             state.exposed_nodes = data['exposed_nodes']
             state.infectious_nodes = data['infectious_nodes']
             state.recovered_nodes = data['recovered_nodes']
+            state.counts = data.get('counts')
             return state
@@ -0,0 +1,44 @@
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+import numpy as np
+
+
+def edge_segments(indptr: np.ndarray, indices: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """
+    Endpoints of every undirected edge of a CSR graph, for drawing.
+
+    Args:
+        indptr: CSR row pointers
+        indices: CSR column indices
+        pos: (n, 2) array of node positions
+
+    Returns:
+        (num_edges, 2, 2) array of line segments
+    """
+    src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    # each edge is stored in both directions, draw it once
+    keep = src < indices
+    return np.stack([pos[src[keep]], pos[indices[keep]]], axis=1)
+
+
+def render_graph(path: str, pos: np.ndarray, segments: np.ndarray, node_color: list):
+    """
+    Draw the graph with nodes colored by state and save it to path.
+
+    Produces the same picture as nx.draw(graph, pos, node_size=50, ...) but
+    only needs plain arrays, so it can run in a separate render process.
+
+    Args:
+        path: Image file to write
+        pos: (n, 2) array of node positions
+        segments: Edge segments from edge_segments
+        node_color: Color of each node
+    """
+    # use a standalone Figure rather than pyplot, which is not thread safe
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.add_collection(LineCollection(segments, colors="k", linewidths=1.0, zorder=1))
+    ax.scatter(pos[:, 0], pos[:, 1], s=50, c=node_color, zorder=2)
+    ax.autoscale_view()
+    ax.set_axis_off()
+    fig.savefig(path)
@@ -0,0 +1,198 @@
+import random
+import time
+
+from seir_config import SEIRConfig
+from seir_output_writer import SEIROutputWriter
+
+
+class SEIRSimulation:
+    """
+    Step loop and bookkeeping shared by the SEIR engines.
+
+    This class owns the output writer, the observers, cancellation, peak and
+    steady-state tracking and the graph description file. An engine supplies
+    _advance (one step of the epidemic), count_states, save_graph_state and
+    _describe_topology, and overrides draw_graph if it renders images.
+
+    Args:
+        config: Simulation config; config.out_dir is read once, at construction
+        writer: Shared output writer. If None, the simulation creates its own
+            and closes it when the run ends
+    """
+
+    def __init__(self, config: SEIRConfig, writer: SEIROutputWriter = None):
+        self.config = config
+        # the graph closes the writer at the end of run() only if it created it
+        self._owns_writer = writer is None
+        if writer is None:
+            writer = SEIROutputWriter(
+                queue_size=self.config.output_queue_size,
+                asynchronous=self.config.async_output,
+                render_processes=self.config.render_processes if self.config.render_images else 0,
+            )
+        self.writer = writer
+        # out_dir changes between runs, but queued writes for this run still need it
+        self.out_dir = config.out_dir
+        self.seed = config.seed
+        if self.seed is not None and self.config.set_seed:
+            random.seed(self.seed)
+        self.num_agents = self.config.num_agents
+
+        self.susceptible_counts = []
+        self.exposed_counts = []
+        self.infectious_counts = []
+        self.recovered_counts = []
+
+        self.step_count = 0
+        self.peak_infections = 0
+        self.time_to_peak = 0
+        self.time_to_steady_state = None
+        self.step_horizon = self.config.num_steps
+        self.observers = []
+        self.cancelled = False
+        self.last_record = None
+
+    def _advance(self):
+        """
+        Move the population forward by one step.
+        """
+        raise NotImplementedError
+
+    def count_states(self) -> list[int]:
+        """
+        Return the current S/E/I/R counts, indexed by SEIRState value.
+        """
+        raise NotImplementedError
+
+    def save_graph_state(self):
+        raise NotImplementedError
+
+    def draw_graph(self):
+        pass
+
+    def _describe_topology(self) -> dict:
+        """
+        Return the graph metrics for describe_graph: degree_distribution,
+        max_degree, average_degree, diameter, radius and density.
+        """
+        raise NotImplementedError
+
+    def _record_initial_state(self):
+        # engines call this once their initial population is set up
+        self.save_graph_state()
+        self.draw_graph()
+
+    def add_observer(self, observer):
+        """
+        Call observer(record) after every step.
+
+        The record is a dict with the step number, the S/E/I/R counts and the
+        step's wall time and throughput (steps/sec and agents/sec).
+        """
+        self.observers.append(observer)
+
+    def cancel(self):
+        # checked between steps, so other threads (e.g. the metrics server) can stop a run
+        self.cancelled = True
+
+    def _publish_step(self, counts, step_seconds: float):
+        self.last_record = {
+            "exp_name": self.config.exp_name,
+            "out_dir": self.out_dir,
+            "step": self.step_count,
+            "susceptible": counts[0],
+            "exposed": counts[1],
+            "infectious": counts[2],
+            "recovered": counts[3],
+            "step_seconds": step_seconds,
+            "steps_per_sec": 1 / step_seconds if step_seconds > 0 else None,
+            "agents_per_sec": self.num_agents / step_seconds if step_seconds > 0 else None,
+        }
+        for observer in self.observers:
+            observer(self.last_record)
+
+    def step(self):
+        start = time.perf_counter()
+        self.step_count += 1
+        self._advance()
+
+        counts = self.count_states()
+        self.susceptible_counts.append(counts[0])
+        self.exposed_counts.append(counts[1])
+        self.infectious_counts.append(counts[2])
+        self.recovered_counts.append(counts[3])
+
+        # Track peak infections
+        current_infectious = counts[2]
+        if current_infectious > self.peak_infections:
+            self.peak_infections = current_infectious
+            self.time_to_peak = self.step_count
+
+        # Check for steady state: no exposed or infectious agents remain
+        current_exposed = counts[1]
+        if self.time_to_steady_state is None and current_exposed == 0 and current_infectious == 0:
+            self.time_to_steady_state = self.step_count
+
+        self.save_graph_state()
+        self.draw_graph()
+        self._publish_step(counts, time.perf_counter() - start)
+
+    def run(self, num_steps: int = None):
+        for _ in self.iter_steps(num_steps):
+            pass
+
+    def iter_steps(self, num_steps: int = None):
+        """
+        Run the simulation, yielding each step's record (see add_observer) as it completes.
+        """
+        if num_steps is None:
+            num_steps = self.config.max_steps if self.config.until_absorbed else self.config.num_steps
+        self.step_horizon = num_steps
+        try:
+            for _ in range(num_steps):
+                if self.cancelled:
+                    break
+                # once no exposed or infectious agents remain the population never changes again
+                if self.time_to_steady_state is not None and (self.config.stop_when_absorbed or self.config.until_absorbed):
+                    break
+                self.step()
+                yield self.last_record
+        finally:
+            # also runs when the consumer stops iterating early, so every run gets its description
+            self._finish()
+
+    def _finish(self):
+        # only an absorbed population may be padded out to the horizon; otherwise it ends where stepping stopped
+        if self.config.until_absorbed or self.time_to_steady_state is None:
+            self.step_horizon = self.step_count
+        try:
+            self.writer.submit(self.describe_graph)
+        finally:
+            if self._owns_writer:
+                self.writer.close()
+
+    def describe_graph(self):
+        # Please include the following
+        # information about each network: a figure or a description of the degree distribution, the maximum degree, the average degree, the diameter of the graph, the radius of the graph, and the density (connectance) of the graph
+        metrics = self._describe_topology()
+
+        # save the rest of the information to a file
+        with open(self.out_dir + "graph_description.txt", "w") as f:
+            f.write("Degree Distribution: " + str(metrics["degree_distribution"]) + "\n")
+            f.write("Maximum Degree: " + str(metrics["max_degree"]) + "\n")
+            f.write("Average Degree: " + str(metrics["average_degree"]) + "\n")
+            # diameter and radius are None when distance_metrics is off
+            f.write("Diameter: " + (str(metrics["diameter"]) if metrics["diameter"] is not None else "Not computed") + "\n")
+            f.write("Radius: " + (str(metrics["radius"]) if metrics["radius"] is not None else "Not computed") + "\n")
+            f.write("Density: " + str(metrics["density"]) + "\n")
+            f.write("Uninfected nodes: " + str(self.count_states()[0]) + "\n")
+            f.write("Peak Infections: " + str(self.peak_infections) + "\n")
+            f.write("Time to Peak: " + str(self.time_to_peak) + "\n")
+            # steps after Final Step up to Step Horizon repeat the final state and were not simulated
+            f.write("Final Step: " + str(self.step_count) + "\n")
+            f.write("Step Horizon: " + str(self.step_horizon) + "\n")
+            # Write time to steady state if it was reached, otherwise write "Not reached"
+            if self.time_to_steady_state is not None:
+                f.write("Time to Steady State: " + str(self.time_to_steady_state) + "\n")
+            else:
+                f.write("Time to Steady State: Not reached\n")